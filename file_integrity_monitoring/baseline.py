@@ -1,85 +1,232 @@
-import json # for reading/writing JSON files
+import os # for walking folders and counting cpu cores
 import time # for timestamps and sleep intervals
+from concurrent.futures import ThreadPoolExecutor # for hashing several files at once
 from pathlib import Path # for handling file paths
 from dataclasses import dataclass # for creating simple classes to hold data
-from typing import Dict # for type hinting
-from file_integrity_monitoring.hasher import sha256_file # to compute file hashes
-from file_integrity_monitoring.ignore import is_ignored # to check if a file should be ignored based on patterns
+from typing import Dict, Optional, Tuple # for type hinting
+from file_integrity_monitoring import jsonio # for reading/writing JSON files (orjson when installed)
+from file_integrity_monitoring.hasher import DEFAULT_ALGO, hash_file # to compute file hashes
+from file_integrity_monitoring.ignore import compile_ignore_patterns, is_ignored # to check if a file should be ignored based on patterns
 
+try:
+    import msgpack # optional: compact binary baseline format (pip install msgpack)
+except ImportError:
+    msgpack = None
+
+# baseline paths with one of these suffixes are stored as msgpack instead of JSON
+MSGPACK_SUFFIXES = (".msgpack", ".mpk")
+
+def baseline_format_available(path: Path) -> bool:
+    '''checks if we can write a baseline to this path (msgpack baselines need the msgpack package)'''
+    return msgpack is not None or path.suffix not in MSGPACK_SUFFIXES
+
+# the shape of each entry in a snapshot - documentation only: snapshots store plain dicts
+# with these keys (building a dataclass and then its __dict__ per file is wasted work)
 @dataclass 
 class FileInfo:
-    sha256: str
+    content_hash: str
     size: int
-    mtime: float
+    mtime: int # nanoseconds since the epoch (st_mtime_ns)
+    ctime: int # inode change time (ns) - the OS sets it on every write or metadata change, it can't be set back
+    ino: int # inode number - changes if the file is replaced by another one (e.g. rename over it)
 
-def _rel(p: Path, root: Path):
+def _same_mtime(info: dict, mtime_ns: int) -> bool:
     '''
-    convert a full file path into a shorter relative to the given root folder
-    makes the stored file names easier to read and consistent in the snapshot
-     - example: "C:/Users/Kate/watchme/notes.txt" → "notes.txt"
+    checks if a snapshot entry's mtime matches mtime_ns (integer nanoseconds)
+    entries migrated from an old float-seconds baseline are marked "mtime_approx": floats only keep
+    the mtime to within a few hundred nanoseconds, so those match if they are within 1 microsecond
     '''
-    return str(p.relative_to(root).as_posix())
+    if info["mtime"] == mtime_ns:
+        return True
+    return bool(info.get("mtime_approx")) and abs(info["mtime"] - mtime_ns) <= 1000
 
-def walk_and_hash(root: Path, ignore_patterns):
+def _hash_one(path: str, stat: os.stat_result, algo: str):
+    '''
+    hashes a single file that was already stat'ed (runs inside a worker thread)
+    returns its info dict, or None if the file could not be read
+    '''
+
+    # try to compute the file's content hash
+    try:
+        # reads the file and computes its content hash
+        return {
+            "content_hash": hash_file(path, algo, stat.st_size), # compute hash of the file
+            "size": stat.st_size, # get file size in bytes
+            "mtime": stat.st_mtime_ns, # get last modification time (integer nanoseconds - exact and cheap to compare)
+            "ctime": stat.st_ctime_ns, # get last inode change time (integer nanoseconds)
+            "ino": stat.st_ino, # get inode number
+        }
+    except (PermissionError, FileNotFoundError):
+        # skip unreadable/vanished files
+        return None
+
+def walk_and_hash(root: Path, ignore_patterns, algo: str = DEFAULT_ALGO, jobs: Optional[int] = None,
+                  prior: Optional[dict] = None):
     """
     walks through the whole folder/files that isnt ignored
-    for each file, computes its sha256 hash, size, and modification time
+    for each file, computes its content hash (using algo), size, and modification time
+    files are hashed in parallel by `jobs` threads (default: one per cpu core)
+    if prior (an earlier snapshot made with the same algo) is given, files whose size, mtime, ctime
+    and inode all match it are not re-read - their old hash is reused
     returns a dictionary (snapshot) that maps each file's path to that info
     """
 
     snapshot: Dict[str, dict] = {} # empty dictionary to hold file info
+    to_hash = [] # (path, relative path, stat) of every file we need to read and hash
+    root_str = str(root)
 
-    # for each file in the root directory and its subdirectories
-    for p in root.rglob("*"): # look at everything under this folder
+    # every path under root is root + separator + the relative part, so the relative path is
+    # just a slice of the string (no path objects, no relpath() per file)
+    # example: if root is /home/user/docs and the file is /home/user/docs/file.txt, rel will be file.txt
+    root_len = len(root_str) if root_str.endswith(os.sep) else len(root_str) + 1
+    to_posix = os.sep != "/" # windows: stored paths always use "/" so snapshots are consistent
+    ignore_re = compile_ignore_patterns(ignore_patterns) # compile the ignore globs once for the whole walk
 
-        # if it is not a file, skip it
-        # if it is a folder that has a file in it we will keep going down until we find a file
-        if not p.is_file(): 
-            continue
+    # look at everything under this folder, one directory at a time
+    # os.scandir tells us file/folder type for free, so we don't need an extra stat() per entry
+    stack = [root_str]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for e in it:
 
-        # converts the path to a short relative path
-        # example: if root is /home/user/docs and p is /home/user/docs/file.txt, rel will be file.txt
-        rel = _rel(p, root) 
+                    # if it is a folder (but not a symlink to one) we will keep going down until we find a file
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                        continue
 
-        # if the file matches any ignore patterns, skip it
-        if is_ignored(root, rel, ignore_patterns):
-            continue
+                    # if it is not a file, skip it
+                    if not e.is_file():
+                        continue
 
-        # try to get the file's stats (size, mtime) and compute its sha256 hash
-        try:
-            stat = p.stat() # get file stats - size, modification time, creation/acess time, etc
+                    # converts the path to a short relative path (see root_len above)
+                    rel = e.path[root_len:]
+                    if to_posix:
+                        rel = rel.replace(os.sep, "/")
+
+                    # if the file matches any ignore patterns, skip it
+                    if is_ignored(root, rel, ignore_re):
+                        continue
 
-            # reads the file and computes its sha256 hash
-            info = FileInfo( 
-                sha256=sha256_file(p), # compute sha256 hash of the file
-                size=stat.st_size, # get file size in bytes
-                mtime=stat.st_mtime # get last modification time 
-            )
+                    # get file stats - size, modification time, etc
+                    try:
+                        stat = e.stat()
+                    except (PermissionError, FileNotFoundError):
+                        continue # skip unreadable/vanished files
 
-            # store the file's info in the snapshot dictionary using its relative path as the key
-            snapshot[rel] = info.__dict__ 
+                    # file looks untouched since the prior snapshot: reuse its entry (and hash) right here,
+                    # without reading the file or handing it to a worker thread
+                    # mtime alone can be set back by anyone who can write the file (os.utime, touch -d),
+                    # so ctime and the inode number must match too
+                    prev = prior.get(rel) if prior else None
+                    if (prev and prev["size"] == stat.st_size and prev["mtime"] == stat.st_mtime_ns
+                            and prev.get("ctime") == stat.st_ctime_ns and prev.get("ino") == stat.st_ino):
+                        snapshot[rel] = prev
+                        continue
+
+                    # reserve the file's slot now so the snapshot keeps the walk order, and hash it later
+                    snapshot[rel] = None
+                    to_hash.append((e.path, rel, stat))
         except (PermissionError, FileNotFoundError):
-            # skip unreadable/vanished files
+            # skip unreadable/vanished folders
             continue
+
+    if not to_hash: # nothing changed since the prior snapshot
+        return snapshot
+
+    # hashing and file reads release the GIL, so threads can keep several files (and cores) busy at once
+    workers = jobs if jobs is not None else (os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        infos = ex.map(lambda item: _hash_one(item[0], item[2], algo), to_hash)
+        for (path, rel, stat), info in zip(to_hash, infos):
+            if info is None:
+                del snapshot[rel] # file could not be read: drop its reserved slot
+            else:
+                snapshot[rel] = info # store the file's info using its relative path as the key
     return snapshot
 
-def save_baseline(snapshot: dict, path: Path):
+def save_baseline(snapshot: dict, path: Path, algo: str = DEFAULT_ALGO):
     '''
     saves the current folder snapshot to a JSON file, aka the baseline
     this file acts as the "safe state" record for future comparisions
+    if the path ends in .msgpack/.mpk it is saved in the smaller, faster msgpack format instead
     '''
 
-    # make a dictionary that stores the current time, schema version, and all file data
-    payload = {"created_utc": time.time(), "schema": 1, "files": snapshot}
+    if path.suffix in MSGPACK_SUFFIXES:
+        _save_baseline_msgpack(snapshot, path, algo)
+        return
+
+    # make a dictionary that stores the current time, schema version, hash algorithm, and all file data
+    payload = {"created_utc": time.time(), "schema": 3, "algo": algo, "files": snapshot}
 
     # convert the dictionary to a JSON string and write it to the given file path given
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    # compact (it is only read by this program) with sorted keys, so baselines of an unchanged folder
+    # differ only in created_utc and diff cleanly
+    path.write_bytes(jsonio.dumps(payload, sort_keys=True))
 
-def load_baseline(path: Path) -> dict:
-    data = json.loads(path.read_text(encoding="utf-8"))
+def _save_baseline_msgpack(snapshot: dict, path: Path, algo: str):
+    '''
+    msgpack version of save_baseline
+    each file is stored as [hash bytes, size, mtime, ctime, inode] - no repeated key names and the hash
+    takes half the space of its hex string
+    '''
+    if msgpack is None:
+        raise ValueError("msgpack baselines require the 'msgpack' package (pip install msgpack)")
+
+    files = {
+        rel: [bytes.fromhex(info["content_hash"]), info["size"], info["mtime"], info["ctime"], info["ino"]]
+        for rel, info in snapshot.items()
+    }
+    payload = {"created_utc": time.time(), "schema": 3, "algo": algo, "files": files}
+    # surrogateescape: file names with bytes that aren't valid UTF-8 are written back as those same bytes
+    path.write_bytes(msgpack.packb(payload, use_bin_type=True, unicode_errors="surrogateescape"))
+
+def _load_baseline_msgpack(raw: bytes) -> dict:
+    '''reads a msgpack baseline back into the same shape as a JSON one'''
+    if msgpack is None:
+        raise ValueError("this baseline is in msgpack format, which requires the 'msgpack' package (pip install msgpack)")
+
+    data = msgpack.unpackb(raw, raw=False, unicode_errors="surrogateescape")
     if not isinstance(data, dict) or "files" not in data:
         raise ValueError("Invalid baseline file")
-    return data["files"]
+
+    data["files"] = {
+        rel: {"content_hash": h.hex(), "size": size, "mtime": mtime, "ctime": ctime, "ino": ino}
+        for rel, (h, size, mtime, ctime, ino) in data["files"].items()
+    }
+    return data
+
+def load_baseline(path: Path) -> Tuple[dict, str]:
+    '''
+    loads a baseline file and returns (files, algo)
+    algo is the hash algorithm the baseline was made with, so new scans can use the same one
+    '''
+    raw = path.read_bytes()
+
+    # JSON baselines always start with "{" - anything else is a msgpack baseline
+    data = jsonio.loads(raw) if raw.lstrip().startswith(b"{") else _load_baseline_msgpack(raw)
+    if not isinstance(data, dict) or "files" not in data:
+        raise ValueError("Invalid baseline file")
+
+    files = data["files"]
+
+    # schema 1 baselines have no "algo" and store the hash under "sha256"
+    schema = data.get("schema", 1)
+    if schema < 2:
+        for info in files.values():
+            info["content_hash"] = info.pop("sha256")
+
+    # schema 1-2 baselines store mtime as float seconds: convert to integer nanoseconds
+    # the float is only accurate to a few hundred nanoseconds, so mark the entry for a tolerant
+    # comparison (see _same_mtime) until the baseline is saved again with exact values
+    # a float ctime can never be matched exactly, so it is dropped: those files are re-hashed once
+    if schema < 3:
+        for info in files.values():
+            info["mtime"] = round(info["mtime"] * 1e9)
+            info["mtime_approx"] = True
+            info.pop("ctime", None)
+    return files, data.get("algo", "sha256")
 
 def compare_snapshots(old: dict, new: dict):
     """
@@ -90,25 +237,28 @@ def compare_snapshots(old: dict, new: dict):
         modified: [rel],          # hash changed (contents of file changed)
         metadata_changed: [rel],  # size/mtime changed but hash same
       }
+    the lists are in snapshot order, not sorted (the reporter sorts them for output)
     """
 
-    old_keys = set(old.keys()) # all file paths in the old baseline
-    new_keys = set(new.keys()) #all file paths in the new scan
-
-    added = sorted(new_keys - old_keys) # files that only appear in new snapchat
-    removed = sorted(old_keys - new_keys) # files that were in the old snapshot but no longer exist (deleted)
+    old_keys = old.keys() # all file paths in the old baseline (a live view, no copy)
+    new_keys = new.keys() # all file paths in the new scan
 
+    added = [rel for rel in new_keys if rel not in old_keys] # files that only appear in new snapchat
+    removed = [] # files that were in the old snapshot but no longer exist (deleted)
     modified = [] 
     meta_changed = []
 
-    # for files (relative path) that exist in both snapshots we check for modification or metadata changes
-    for rel in sorted(old_keys & new_keys):
-        o, n = old[rel], new[rel] 
-        if o["sha256"] != n["sha256"]: # if hash no longer are equal
+    # for files (relative path) in the old snapshot we check if they were removed, modified, or had metadata changes
+    for rel in old_keys:
+        n = new.get(rel)
+        if n is None: # file no longer exists
+            removed.append(rel)
+            continue
+        o = old[rel]
+        if o["content_hash"] != n["content_hash"]: # if hash no longer are equal
             modified.append(rel) # add to modified list
-        else: # if size no longer are equal
-            if o.get("size") != n.get("size") or int(o.get("mtime", 0)) != int(n.get("mtime", 0)):
-                meta_changed.append(rel) # add to meta_changed list
+        elif o["size"] != n["size"] or not _same_mtime(o, n["mtime"]): # if size or mtime no longer are equal
+            meta_changed.append(rel) # add to meta_changed list
 
     return {
         "added": added,
@@ -1,17 +1,113 @@
-from hashlib import sha256 # for computing hashes to detect content changes
+import hashlib # for computing hashes to detect content changes
+import os # for low-level open/read of small files
 
-def sha256_file(path, chunk_size=1024 * 1024): #1 MB per chunk
+try:
+    import xxhash # optional: much faster non-cryptographic hash (pip install xxhash)
+except ImportError:
+    xxhash = None
+
+# use xxh3-128 when it is installed, otherwise fall back to the built-in SHA-256
+# FIM only needs to notice that content changed, so a fast non-cryptographic hash is enough
+DEFAULT_ALGO = "xxh3_128" if xxhash is not None else "sha256"
+
+# files up to this size (when the caller already knows the size) are read with a single read() call
+SMALL_FILE = 256 * 1024 # 256 KB
+
+# files bigger than this are read in large chunks with a sequential-read hint to the kernel
+LARGE_FILE = 64 * 1024 * 1024 # 64 MB
+LARGE_CHUNK = 8 * 1024 * 1024 # 8 MB
+
+def algo_available(algo: str) -> bool:
+    '''checks if we can compute the given hash algorithm on this machine'''
+    if algo == "xxh3_128":
+        return xxhash is not None
+    return algo in hashlib.algorithms_available
+
+def _new_hasher(algo: str):
+    '''create an empty hash object for the given algorithm name (as stored in the baseline)'''
+    if algo == "xxh3_128":
+        if xxhash is None:
+            raise ValueError("xxh3_128 requires the 'xxhash' package (pip install xxhash)")
+        return xxhash.xxh3_128()
+    return hashlib.new(algo)
+
+def _hash_small_file(path, algo: str, size: int):
+    '''
+    hash a small file with raw os.open/os.read instead of a python file object
+    trees with many small files are dominated by syscalls: this needs only open + read + close
+    (a file object adds an fstat, and the read loop needs a second read to see the end of the file)
+    '''
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0)) # O_BINARY only exists (and matters) on windows
+    try:
+        h = _new_hasher(algo)
+        want = size + 1 # ask for one byte more than expected so a short read tells us we hit the end
+        while True:
+            chunk = os.read(fd, want)
+            h.update(chunk)
+            if len(chunk) < want: # short read = end of file
+                break
+            want = 1024 * 1024 # file grew since it was stat'ed: read the rest 1 MB at a time
+        return h.hexdigest()
+    finally:
+        os.close(fd)
+
+def _hash_large_file(f, algo: str):
+    '''
+    hash a big (already opened, unbuffered) file
+    tells the kernel we read front to back so it reads ahead more aggressively, and reads 8 MB
+    at a time into one reused buffer
+    (mmap would avoid a copy too, but a file truncated while mapped crashes python with SIGBUS -
+    not something a monitor of live files can risk)
+    '''
+    if hasattr(os, "posix_fadvise"): # linux/unix only
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass # only a hint - some filesystems (network, FUSE) reject it
+
+    h = _new_hasher(algo)
+    buf = bytearray(LARGE_CHUNK)
+    view = memoryview(buf)
+    while True:
+        n = f.readinto(buf) # fill the buffer without allocating a new bytes object
+        if not n: # if there is nothing left to read, stop
+            break
+        h.update(view[:n])
+    return h.hexdigest()
+
+def hash_file(path, algo=DEFAULT_ALGO, size=None):
     """
-    return the SHA-256 hash of a file's contnent
+    return the hash of a file's content using the given algorithm (default: xxh3_128 or sha256)
+    size is optional: pass the file size if you already know it (e.g. from stat) to speed up small files
     """
-    h = sha256() # create a new SHA-256 object (comes from pythons built-in hashlib module)
+    if size is not None and size <= SMALL_FILE:
+        return _hash_small_file(path, algo, size)
+
+    # unbuffered: file_digest reads straight into its own buffer, so python's buffer would only add a copy
+    with open(path, "rb", buffering=0) as f:
+
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
+        if size > LARGE_FILE:
+            return _hash_large_file(f, algo)
+
+        # python 3.11+: let hashlib drive the read loop (reuses one buffer, no new bytes object per chunk)
+        # openssl picks the fastest sha256 code for this cpu (e.g. SHA-NI instructions)
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, lambda: _new_hasher(algo)).hexdigest()
 
-    with open(path, "rb") as f: # open file in binary mode
+        h = _new_hasher(algo) # create a new hash object
 
         #read in chunks
         while True:
-            chunk = f.read(chunk_size) # read 1 MB at a time
+            chunk = f.read(1024 * 1024) # read 1 MB at a time
             if not chunk: # if there is nothing left to read, stop
                 break
             h.update(chunk) # feed this chunk into the hash calculator
-    return h.hexdigest() #return the final hash as a 64-char hexadecimal string
+    return h.hexdigest() #return the final hash as a hexadecimal string
+
+def sha256_file(path):
+    """
+    return the SHA-256 hash of a file's contnent
+    """
+    return hash_file(path, "sha256")
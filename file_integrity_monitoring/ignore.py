@@ -1,6 +1,27 @@
+import os # for checking if the filesystem is case-insensitive
+import re # for compiling all patterns into one regular expression
+from functools import lru_cache # for remembering .fimignore contents between calls
 from pathlib import Path # for working with file and direcotry paths 
-from fnmatch import fnmatch # for matching filenames against patterns (*.tmp, *.log)
-from typing import List, Optional #
+from fnmatch import translate # for turning glob patterns (*.tmp, *.log) into regular expressions
+from typing import List, Optional, Pattern, Tuple, Union #
+
+@lru_cache(maxsize=16)
+def _read_fimignore(f: Path, mtime_ns: int) -> Tuple[str, ...]:
+    '''
+    reads the patterns out of a .fimignore file
+    cached by (path, modification time) so the file is only parsed again after it has been edited
+    '''
+    patterns: List[str] = []
+    try:
+        # read each line of the .fimignore file
+        for line in f.read_text(encoding="utf-8", errors="ignore").splitlines():
+            line = line.strip() # remove leading/trailing whitespace
+            if not line or line.startswith("#"): # skip empty lines and comments
+                continue 
+            patterns.append(line) # add the pattern to the list
+    except Exception:
+        pass
+    return tuple(patterns)
 
 def load_ignore_patterns(root: Path, ignore_from: Optional[str]) -> List[str]:
     """
@@ -16,16 +37,12 @@ def load_ignore_patterns(root: Path, ignore_from: Optional[str]) -> List[str]:
 
     #if there is a .fimignore file in the root directory, read it and add its patterns to the ignore list
     f = root / ".fimignore"
-    if f.exists(): # if the .fimignore file exists
-        try:
-            # read each line of the .fimignore file
-            for line in f.read_text(encoding="utf-8", errors="ignore").splitlines():
-                line = line.strip() # remove leading/trailing whitespace
-                if not line or line.startswith("#"): # skip empty lines and comments
-                    continue 
-                patterns.append(line) # add the pattern to the list
-        except Exception:
-            pass
+    try:
+        mtime_ns = f.stat().st_mtime_ns # also tells us if the .fimignore file exists
+    except OSError:
+        mtime_ns = None
+    if mtime_ns is not None:
+        patterns.extend(_read_fimignore(f, mtime_ns))
 
     # --ignore CLI (comma separated)
     # if the user provided additional ignore patterns via the command line, add those too
@@ -39,16 +56,30 @@ def load_ignore_patterns(root: Path, ignore_from: Optional[str]) -> List[str]:
     patterns.append(".fim_baseline.json")
     return patterns
 
-def is_ignored(root: Path, relpath: str, patterns: List[str]) -> bool:
+def compile_ignore_patterns(patterns: List[str]) -> Pattern[str]:
+    """
+    turns the list of glob patterns into one compiled regular expression
+    so each file is checked with a single regex match instead of one fnmatch call per pattern
+    """
+    if not patterns: # nothing to ignore: a regex that never matches
+        return re.compile(r"(?!)")
+
+    # fnmatch ignores case on case-insensitive systems (windows), so do the same
+    flags = re.IGNORECASE if os.path.normcase("A") != "A" else 0
+    return re.compile("|".join(f"(?:{translate(pat)})" for pat in patterns), flags)
+
+def is_ignored(root: Path, relpath: str, patterns: Union[List[str], Pattern[str]]) -> bool:
     """
     checks if a file should be skipped based on ignore patterns (like from .fimignore)
+    patterns can be the list from load_ignore_patterns or the regex from compile_ignore_patterns
     if the files name or path matchhes a pattern, it returns True
         otherwise it returns false
     """
-    name = Path(relpath).name  # get the filename
+    if not isinstance(patterns, re.Pattern): # compile on the fly (callers in a loop should compile once)
+        patterns = compile_ignore_patterns(patterns)
+
+    # get the filename (the part after the last "/") without building a Path object
+    name = relpath[relpath.rfind("/") + 1:]
 
-    # go through every ignored pattern
-    for pat in patterns: 
-        if fnmatch(name, pat) or fnmatch(relpath, pat): # if match found, ignore the file
-            return True
-    return False
+    # if the name or the full relative path matches any pattern, ignore the file
+    return bool(patterns.match(name)) or bool(patterns.match(relpath))
@@ -0,0 +1,34 @@
+import json # built-in JSON, used when orjson is not installed
+
+try:
+    import orjson # optional: much faster JSON encoder/decoder (pip install orjson)
+except ImportError:
+    orjson = None
+
+def dumps(obj, indent: bool = False, sort_keys: bool = False) -> bytes:
+    '''
+    convert obj to UTF-8 JSON bytes
+    compact (no spaces) by default, pretty-printed with 2 spaces if indent=True
+    sort_keys=True writes object keys in sorted order, so the same data always gives the same bytes
+    uses orjson when it is installed, otherwise the built-in json module
+    '''
+    if orjson is not None:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except orjson.JSONEncodeError:
+            # orjson rejects strings that aren't valid UTF-8 (e.g. file names with undecodable
+            # bytes, which python keeps as surrogates) - the built-in json escapes them as \udcxx
+            pass
+    if indent:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys).encode("utf-8")
+
+def loads(data: bytes):
+    '''parse JSON bytes (or str) back into python objects'''
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass # orjson rejects lone surrogate escapes (\udcxx) that the built-in json writes and reads
+    return json.loads(data)
@@ -9,7 +9,11 @@ from file_integrity_monitoring.baseline import (
     save_baseline,
     load_baseline,
     compare_snapshots,
+    baseline_format_available,
 )
+# import helper to check which hash algorithms this machine supports
+from file_integrity_monitoring.hasher import algo_available
+
 # import helper for ignore file patters
 from file_integrity_monitoring.ignore import load_ignore_patterns
 
@@ -18,6 +22,16 @@ from file_integrity_monitoring.reporter import print_summary, save_report
 
 DEFAULT_BASELINE = ".fim_baseline.json"
 
+def _positive_int(value: str) -> int:
+    '''argparse type for options like --jobs that must be a whole number of at least 1'''
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
 def parse_args():
     p = argparse.ArgumentParser(
         prog="fim",
@@ -32,40 +46,54 @@ def parse_args():
     s_init.add_argument("--ignore", type=str, default=None,
                         help='Comma-separated ignore globs (e.g., "*.log,*.tmp")')
     s_init.add_argument("--baseline", type=Path, default=None,
-                        help=f"Baseline file path (default: ROOT/{DEFAULT_BASELINE})")
+                        help=f"Baseline file path (default: ROOT/{DEFAULT_BASELINE}; "
+                             "use a .msgpack suffix for the binary format)")
+    s_init.add_argument("--jobs", type=_positive_int, default=None,
+                        help="Number of files to hash in parallel (default: one per CPU core)")
 
     # scan (supports multi-run, append, ndjson, accept-baseline)
     s_scan = sub.add_parser("scan", help="Compare current state to baseline and emit report")
     s_scan.add_argument("--ignore", type=str, default=None)
     s_scan.add_argument("--baseline", type=Path, default=None)
+    s_scan.add_argument("--jobs", type=_positive_int, default=None)
     s_scan.add_argument("-o", "--out", type=Path, default=Path("fim_report.json"),
                         help="Write report here (json or ndjson)")
     s_scan.add_argument("--append", action="store_true",
                         help="Append results instead of overwriting")
     s_scan.add_argument("--ndjson", action="store_true",
                         help="Emit newline-delimited JSON (one JSON object per line)")
+    s_scan.add_argument("--pretty", action="store_true",
+                        help="Indent the JSON report for reading (ignored with --ndjson)")
     s_scan.add_argument("--interval", type=int, default=0,
                         help="Repeat scan every N seconds (0 = run once)")
     s_scan.add_argument("--max-runs", type=int, default=1,
                         help="Number of scans to run (default 1)")
     s_scan.add_argument("--accept-baseline", action="store_true",
                         help="After finishing the scan(s), update the baseline to the current state")
+    s_scan.add_argument("--rehash", action="store_true",
+                        help="Re-hash every file, even ones whose size, timestamps and inode are unchanged")
 
     # accept (promote current state to baseline without scanning)
     s_acc = sub.add_parser("accept", help="Promote current on-disk state to the baseline")
     s_acc.add_argument("--ignore", type=str, default=None)
     s_acc.add_argument("--baseline", type=Path, default=None)
+    s_acc.add_argument("--jobs", type=_positive_int, default=None)
 
     # monitor (poll forever)
     s_mon = sub.add_parser("monitor", help="Continuously scan & report changes")
     s_mon.add_argument("--ignore", type=str, default=None)
     s_mon.add_argument("--baseline", type=Path, default=None)
+    s_mon.add_argument("--jobs", type=_positive_int, default=None)
     s_mon.add_argument("--interval", type=int, default=15, help="Seconds between scans (default 15)")
     s_mon.add_argument("-o", "--out", type=Path, default=Path("fim_report.json"))
     s_mon.add_argument("--append", action="store_true",
                        help="Append results each interval")
     s_mon.add_argument("--ndjson", action="store_true",
                        help="Use newline-delimited JSON for continuous logging")
+    s_mon.add_argument("--pretty", action="store_true",
+                       help="Indent the JSON report for reading (ignored with --ndjson)")
+    s_mon.add_argument("--rehash", action="store_true",
+                       help="Re-hash every file, even ones whose size, timestamps and inode are unchanged")
 
     return p.parse_args()
 
@@ -75,6 +103,20 @@ def baseline_path(root: Path, override: Optional[Path]):
     # if override is given, use that. otherwise use default location (root/.fim_baseline.json)
     return (override if override else (root / DEFAULT_BASELINE))
 
+def _load_baseline_checked(bl: Path):
+    '''loads the baseline and makes sure we can hash new scans with the same algorithm it used'''
+
+    try:
+        old, algo = load_baseline(bl)
+    except ValueError as e: # not a baseline, or a msgpack baseline without msgpack installed
+        raise SystemExit(f"[error] cannot read baseline {bl}: {e}")
+
+    # a baseline made with xxh3_128 can only be compared on a machine that has xxhash installed
+    if not algo_available(algo):
+        raise SystemExit(f"[error] baseline {bl} uses hash algorithm '{algo}', which is not available here "
+                         f"(pip install xxhash, or re-run 'fim <root> init').")
+    return old, algo
+
 def _ensure_root_exists(root: Path):
     '''checks if the folder we want to monitor exists'''
 
@@ -82,7 +124,13 @@ def _ensure_root_exists(root: Path):
     if not root.exists():
         raise SystemExit(f"[error] root folder does not exist: {root}")
 
-def do_init(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Path]):
+def _ensure_baseline_writable(bl: Path):
+    '''checks that we can save the baseline in the format its file name asks for, before spending time on a scan'''
+    if not baseline_format_available(bl):
+        raise SystemExit(f"[error] baseline {bl} uses the msgpack format, which requires the 'msgpack' package "
+                         f"(pip install msgpack, or use a .json baseline).")
+
+def do_init(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Path], jobs: Optional[int] = None):
     '''
     takes a picture of what this folder looks like right now and saves it as a baseline
     creating the baseline
@@ -92,14 +140,16 @@ def do_init(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Path]
     root = root.resolve() # absolute full path for root
     _ensure_root_exists(root) # check if root exists
     bl = baseline_path(root, baseline_file) # find where to save the baseline file; uses default (watchme/.fim_baseline.json) if none is given. know where to write data
+    _ensure_baseline_writable(bl) # fail now rather than after hashing the whole folder
     patterns = load_ignore_patterns(root, ignore_csv) # skip unnecessary files by reading .fimignore or --ignore
-    snap = walk_and_hash(root, patterns) # take a snapshot of the current state of the folder
+    snap = walk_and_hash(root, patterns, jobs=jobs) # take a snapshot of the current state of the folder
     save_baseline(snap, bl) # write the snapshot to the baseline file for future comparisons
     print(f"Baseline created -> {bl}  (files tracked: {len(snap)})") # inform user of success
 
 def do_scan(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Path],
             out: Path, append: bool, ndjson: bool, interval: int, max_runs: int,
-            accept_baseline: bool):
+            accept_baseline: bool, jobs: Optional[int] = None, rehash: bool = False,
+            pretty: bool = False):
     """
     - using an existing baseline to detect changes
 
@@ -107,6 +157,7 @@ def do_scan(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Path]
      - If interval > 0 and max_runs>1, repeat N times.
     uses a rolling in-memory comparison so later runs only show new changes.
     optionally updates the baseline at the end (--accept-baseline).
+    files whose size, mtime, ctime and inode match the previous snapshot are not re-hashed unless rehash=True.
 
     fim scan --interval N --max-runs M
     """
@@ -121,25 +172,26 @@ def do_scan(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Path]
         raise SystemExit(f"[error] baseline not found: {bl}. Run 'fim {root} init' first.")
     
     patterns = load_ignore_patterns(root, ignore_csv)
-    old = load_baseline(bl)  # load the previous baseline snapshot
+    old, algo = _load_baseline_checked(bl)  # load the previous baseline snapshot and its hash algorithm
 
     # loop through each scan run
     for run in range(1, max_runs + 1):
-        new = walk_and_hash(root, patterns) # scan the directory and compute file hashes
+        # scan the directory and compute file hashes (reusing hashes of files that look untouched)
+        new = walk_and_hash(root, patterns, algo, jobs, prior=None if rehash else old)
         changes = compare_snapshots(old, new) # compare old and new snapshot to detect changes
         print(f"\nRun {run}/{max_runs}:")
         print_summary(changes, root)
-        save_report(changes, root, out, append=append, ndjson=ndjson)
+        save_report(changes, root, out, append=append, ndjson=ndjson, pretty=pretty)
         old = new  # update new baseline 
         if interval > 0 and run < max_runs:
             time.sleep(interval)
 
     # if --accept-baseline enabled, make the latest snapshot as the new "safe"
     if accept_baseline:
-        save_baseline(old, bl)  # old is the latest snapshot after the loop
+        save_baseline(old, bl, algo)  # old is the latest snapshot after the loop
         print(f"\nBaseline updated -> {bl}")
 
-def do_accept(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Path]):
+def do_accept(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Path], jobs: Optional[int] = None):
     """
     updates (or creates) the baseline immediately, without running a scan or printing change logs
 
@@ -149,13 +201,15 @@ def do_accept(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Pat
     root = root.resolve()
     _ensure_root_exists(root)
     bl = baseline_path(root, baseline_file)
+    _ensure_baseline_writable(bl)
     patterns = load_ignore_patterns(root, ignore_csv)
-    snap = walk_and_hash(root, patterns) # scan the directory and compute file hashes
+    snap = walk_and_hash(root, patterns, jobs=jobs) # scan the directory and compute file hashes
     save_baseline(snap, bl)
     print(f"Baseline updated -> {bl}  (files tracked: {len(snap)})")
 
 def do_monitor(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Path],
-               out: Path, interval: int, append: bool, ndjson: bool):
+               out: Path, interval: int, append: bool, ndjson: bool, jobs: Optional[int] = None,
+               rehash: bool = False, pretty: bool = False):
     '''
     continuous monitoring move, forever until ctrl + C
 
@@ -168,15 +222,15 @@ def do_monitor(root: Path, ignore_csv: Optional[str], baseline_file: Optional[Pa
     if not bl.exists():
         raise SystemExit(f"[error] baseline not found: {bl}. Run 'fim {root} init' first.")
     patterns = load_ignore_patterns(root, ignore_csv)
-    old = load_baseline(bl)
+    old, algo = _load_baseline_checked(bl)
 
     print(f"Monitoring {root} every {interval}s. Press Ctrl+C to stop.")
     while True:
         try:
-            new = walk_and_hash(root, patterns)
+            new = walk_and_hash(root, patterns, algo, jobs, prior=None if rehash else old)
             changes = compare_snapshots(old, new)
             print_summary(changes, root)
-            save_report(changes, root, out, append=append, ndjson=ndjson)
+            save_report(changes, root, out, append=append, ndjson=ndjson, pretty=pretty)
             old = new
             time.sleep(interval)
         except KeyboardInterrupt:
@@ -187,7 +241,7 @@ def main():
     args = parse_args()
 
     if args.cmd == "init": # save current folder/file as baseline aka "safe". well check if changed later
-        do_init(args.root, args.ignore, args.baseline) 
+        do_init(args.root, args.ignore, args.baseline, args.jobs)
 
     elif args.cmd == "scan": # compare current state to baseline and emit report
         do_scan(
@@ -199,13 +253,17 @@ def main():
             args.ndjson, # use JSON format
             args.interval, # seconds between scans (0 = run once)
             args.max_runs, # number of scans to run
-            args.accept_baseline # update baseline to current state after scans
+            args.accept_baseline, # update baseline to current state after scans
+            args.jobs, # number of files to hash in parallel
+            args.rehash, # re-hash every file instead of reusing hashes of untouched files
+            args.pretty # indent the JSON report
         )
     elif args.cmd == "accept": # if we trust current state, then promote it to base line without scanning
-        do_accept(args.root, args.ignore, args.baseline
+        do_accept(args.root, args.ignore, args.baseline, args.jobs
         )
     elif args.cmd == "monitor": # continuously scan & report changes
-        do_monitor(args.root, args.ignore, args.baseline, args.out, args.interval, args.append, args.ndjson)
+        do_monitor(args.root, args.ignore, args.baseline, args.out, args.interval, args.append, args.ndjson, args.jobs, args.rehash,
+                   args.pretty)
 
 if __name__ == "__main__":
     main()
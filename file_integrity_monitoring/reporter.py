@@ -1,4 +1,4 @@
-import json # for reading and writing JSON files
+from file_integrity_monitoring import jsonio # for reading and writing JSON files (orjson when installed)
 from pathlib import Path # for working with file and direcotry paths 
 from datetime import datetime # timestamps
 
@@ -10,6 +10,7 @@ def print_summary(changes: dict, root: Path):
     ''' 
     prints a formatted summary of detected file changes in the given directory
     grpups files into added, removed, modified, and metadata changed categories
+    each group is listed in sorted order
     '''
 
     print(f"\n=== File Integrity Monitor @ {root} ===")
@@ -22,34 +23,75 @@ def print_summary(changes: dict, root: Path):
     # if any new files were added since the last baseline, list them 
     if changes["added"]:
         print("\n[ADDED]")
-        for r in changes["added"]:
+        for r in sorted(changes["added"]):
             print("  +", r)
 
     # if any files were deleted since the last baseline, list them
     if changes["removed"]:
         print("\n[REMOVED]")
-        for r in changes["removed"]:
+        for r in sorted(changes["removed"]):
             print("  -", r)
 
     # if any files content changed (different hash num) then lisit then
     if changes["modified"]:
         print("\n[MODIFIED] (content changed)")
-        for r in changes["modified"]:
+        for r in sorted(changes["modified"]):
             print("  *", r)
 
     # if file metadata (size or modification time) changed but content didnt then list them
     if changes["metadata_changed"]:
         print("\n[METADATA CHANGED] (mtime/size changed, content unchanged)")
-        for r in changes["metadata_changed"]:
+        for r in sorted(changes["metadata_changed"]):
             print("  ~", r)
 
-def save_report(changes: dict, root: Path, out: Path, append: bool = False, ndjson: bool = False):
+def _append_to_json_array(out: Path, payload: dict, pretty: bool) -> bool:
+    '''
+    appends payload to the JSON array in `out` in place: only the closing "]" at the end of the
+    file is rewritten, so the cost doesn't grow with the size of the report
+    returns False if the file isn't a JSON array (caller falls back to a full rewrite)
+    '''
+    with open(out, "r+b") as f:
+        # a JSON array starts with "[" - anything else (e.g. a single object) needs the slow path
+        if not f.read(64).lstrip().startswith(b"["):
+            return False
+
+        end = f.seek(0, 2) # jump to the end of the file
+        start = max(0, end - 4096)
+        f.seek(start)
+        tail = f.read().rstrip() # last few KB, without trailing whitespace/newlines
+
+        # ...and ends with "]"
+        if not tail.endswith(b"]"):
+            return False
+        before = tail[:-1].rstrip()
+        if not before: # could not see what comes before "]" in the tail we read
+            return False
+
+        if pretty:
+            # indent the new entry by 2 spaces so it lines up with the existing ones
+            entry = b"\n".join(b"  " + line for line in jsonio.dumps(payload, indent=True).splitlines())
+            sep, close = b"\n", b"\n]"
+        else:
+            entry = jsonio.dumps(payload)
+            sep, close = b"", b"]"
+        if not before.endswith(b"["): # no comma after "[" of an empty array
+            sep = b"," + sep
+
+        f.seek(start + len(before)) # just after the last entry (drops the closing "]")
+        f.truncate()
+        f.write(sep + entry + close)
+    return True
+
+def save_report(changes: dict, root: Path, out: Path, append: bool = False, ndjson: bool = False,
+                pretty: bool = False):
     """
     save results either as:
       - NDJSON (newline-delimited JSON). ff ndjson=True, writes/append one JSON object per scan.
       - regular JSON:
           - if append=False: overwrite with a JSON array containing this payload.
           - if append=True: append this payload to an existing JSON array (or create one).
+            the existing file is not re-read - the new entry is written before its closing "]".
+          - compact by default, indented with 2 spaces if pretty=True.
     """
 
     # ensure the output directory exists
@@ -59,21 +101,26 @@ def save_report(changes: dict, root: Path, out: Path, append: bool = False, ndjs
     payload = {
         "root": str(root), # directory scanned
         "generated_at": _now_iso(), # timestamp
-        "changes": changes, # dictionary of detected file changes
+        "changes": {k: sorted(v) for k, v in changes.items()}, # dictionary of detected file changes (sorted paths)
     }
 
     if ndjson:
-        line = json.dumps(payload) # convert payload into a single JSON string
-        mode = "a" if append else "w"
-        with open(out, mode, encoding="utf-8") as f:
-            f.write(line + "\n")
+        line = jsonio.dumps(payload) # convert payload into a single line of JSON
+        mode = "ab" if append else "wb"
+        with open(out, mode) as f:
+            f.write(line + b"\n")
         print(f"\nSaved -> {out} ({'append' if append else 'overwrite'}, ndjson)")
         return
 
     # JSON file behavior 
+    # fast path: add this payload to the end of the existing array without re-reading the whole file
+    if append and out.exists() and _append_to_json_array(out, payload, pretty):
+        print(f"\nSaved -> {out} (append, json)")
+        return
+
     if append and out.exists():
         try:
-            old = json.loads(out.read_text(encoding="utf-8")) # read existing JSON contnet
+            old = jsonio.loads(out.read_bytes()) # read existing JSON contnet
             if isinstance(old, list): # if it is already a list of dictionaries (multiple logs) 
                 old.append(payload) # append new data
                 data = old
@@ -84,6 +131,6 @@ def save_report(changes: dict, root: Path, out: Path, append: bool = False, ndjs
     else:
         data = [payload] # if not appending or file does not exist, start a new list with this payload
 
-    #converts the data into a nicely formatted JSON string - easier to read
-    out.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    #converts the data into a JSON string (nicely formatted if pretty - easier to read)
+    out.write_bytes(jsonio.dumps(data, indent=pretty))
     print(f"\nSaved -> {out} ({'append' if append else 'overwrite'}, json)")
@@ -0,0 +1,106 @@
+'''
+checks for the on-disk formats: appending to JSON reports in place, and reading old baselines
+run with: python -m unittest discover tests
+'''
+import contextlib # to silence the "Saved -> ..." lines
+import hashlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from file_integrity_monitoring.baseline import compare_snapshots, load_baseline, walk_and_hash
+from file_integrity_monitoring.reporter import _append_to_json_array, save_report
+
+CHANGES = {"added": ["new.txt"], "removed": [], "modified": [], "metadata_changed": []}
+
+class AppendToJsonArrayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = Path(self.tmp.name) / "report.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _append(self, existing: str, pretty: bool = False):
+        '''writes `existing` to the report, appends one scan to it, and returns the parsed result'''
+        self.out.write_text(existing)
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_report(CHANGES, Path("/watched"), self.out, append=True, pretty=pretty)
+        return json.loads(self.out.read_text())
+
+    def test_compact_array(self):
+        data = self._append('[{"root":"/a"},{"root":"/b"}]')
+        self.assertEqual([d["root"] for d in data], ["/a", "/b", "/watched"])
+        self.assertEqual(data[-1]["changes"], CHANGES)
+
+    def test_pretty_array(self):
+        data = self._append(json.dumps([{"root": "/a"}], indent=2) + "\n", pretty=True)
+        self.assertEqual([d["root"] for d in data], ["/a", "/watched"])
+        self.assertTrue(self.out.read_text().endswith("\n  }\n]")) # new entry is indented like the old ones
+
+    def test_empty_array(self):
+        for existing in ("[]", "[\n]\n", "  [ ]"):
+            for pretty in (False, True):
+                data = self._append(existing, pretty)
+                self.assertEqual([d["root"] for d in data], ["/watched"], existing)
+
+    def test_single_object_is_wrapped_in_a_list(self):
+        # an object is not an array: the fast path must refuse it, and the full rewrite turns it into a list
+        self.out.write_text('{"root": "/a", "changes": {"added": ["x"]}}')
+        self.assertFalse(_append_to_json_array(self.out, {"root": "/watched"}, pretty=False))
+        data = self._append('{"root": "/a", "changes": {"added": ["x"]}}')
+        self.assertEqual([d["root"] for d in data], ["/a", "/watched"])
+
+    def test_object_ending_in_bracket_is_not_an_array(self):
+        # ends with "]" but doesn't start with "[" - must not be patched in place
+        self.out.write_text('{"root": "/a"}\n]')
+        self.assertFalse(_append_to_json_array(self.out, {"root": "/watched"}, pretty=False))
+
+class LoadOldBaselineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "watched"
+        self.root.mkdir()
+        (self.root / "a.txt").write_text("hello")
+        (self.root / "sub").mkdir()
+        (self.root / "sub" / "b.txt").write_text("world")
+
+        # schema 1, as the first release wrote it: sha256 only, float-second mtimes, indented
+        files = {}
+        for rel in ("a.txt", "sub/b.txt"):
+            p = self.root / rel
+            st = p.stat()
+            files[rel] = {"sha256": hashlib.sha256(p.read_bytes()).hexdigest(), "size": st.st_size, "mtime": st.st_mtime}
+        self.bl = Path(self.tmp.name) / "baseline.json"
+        self.bl.write_text(json.dumps({"created_utc": 0.0, "schema": 1, "files": files}, indent=2))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_schema1_loads_and_unchanged_tree_has_no_changes(self):
+        old, algo = load_baseline(self.bl)
+        self.assertEqual(algo, "sha256")
+        self.assertEqual(set(old), {"a.txt", "sub/b.txt"})
+        self.assertIsInstance(old["a.txt"]["mtime"], int) # migrated to nanoseconds
+
+        new = walk_and_hash(self.root, [], algo, jobs=1, prior=old)
+        changes = compare_snapshots(old, new)
+        self.assertEqual(changes, {"added": [], "removed": [], "modified": [], "metadata_changed": []})
+
+    def test_schema1_edit_with_mtime_reset_is_detected(self):
+        old, algo = load_baseline(self.bl)
+        p = self.root / "a.txt"
+        st = p.stat()
+        p.write_text("HELLO") # same size
+        os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns)) # and the old mtime
+
+        new = walk_and_hash(self.root, [], algo, jobs=1, prior=old)
+        self.assertEqual(compare_snapshots(old, new)["modified"], ["a.txt"])
+
+if __name__ == "__main__":
+    unittest.main()